@@ -0,0 +1,165 @@
+"""
+Projection of raw TMDB payloads into the compact dicts the tools return.
+
+Kept free of I/O and fully annotated so it can be compiled with mypyc
+(`mypyc _project.py`); the pure-Python module is used when it isn't.
+"""
+from itertools import islice
+from types import MappingProxyType
+from typing import Any, Dict, List
+
+# Genre keywords accepted from users/the agent, mapped to TMDB genre IDs
+_GENRES: Dict[str, int] = {
+    # Action & Adventure
+    'action': 28,
+    'adventure': 12,
+    'thriller': 53,
+
+    # Comedy & Drama
+    'comedy': 35,
+    'funny': 35,
+    'drama': 18,
+
+    # Horror & Mystery
+    'horror': 27,
+    'scary': 27,
+    'mystery': 9648,
+
+    # Romance & Family
+    'romance': 10749,
+    'romantic': 10749,
+    'family': 10751,
+
+    # Sci-Fi & Fantasy
+    'science fiction': 878,
+    'sci-fi': 878,
+    'fantasy': 14,
+
+    # Other
+    'documentary': 99,
+    'animation': 16,
+    'crime': 80,
+    'war': 10752,
+    'western': 37,
+    'history': 36,
+    'music': 10402,
+    'tv movie': 10770
+}
+GENRE_MAPPING = MappingProxyType(_GENRES)
+
+# Genre ID -> TMDB display name for annotating results, spelled the way
+# get_movie_details reports genres
+GENRE_ID_TO_NAME = MappingProxyType({
+    28: 'Action',
+    12: 'Adventure',
+    16: 'Animation',
+    35: 'Comedy',
+    80: 'Crime',
+    99: 'Documentary',
+    18: 'Drama',
+    10751: 'Family',
+    14: 'Fantasy',
+    36: 'History',
+    27: 'Horror',
+    10402: 'Music',
+    9648: 'Mystery',
+    10749: 'Romance',
+    878: 'Science Fiction',
+    10770: 'TV Movie',
+    53: 'Thriller',
+    10752: 'War',
+    37: 'Western'
+})
+
+
+def _format_movie_details(response: Dict[str, Any]) -> Dict[str, Any]:
+    # Filter to essential fields only
+    filtered_response: Dict[str, Any] = {
+        'id': response.get('id'),
+        'title': response.get('title'),
+        'overview': response.get('overview'),
+        'release_date': response.get('release_date'),
+        'runtime': response.get('runtime'),
+        'vote_average': response.get('vote_average'),
+        'vote_count': response.get('vote_count'),
+        'budget': response.get('budget'),
+        'revenue': response.get('revenue'),
+        'genres': [genre['name'] for genre in response.get('genres', [])],
+    }
+
+    # Add cast and crew if credits are included
+    if 'credits' in response:
+        credits = response['credits']
+        filtered_response['cast'] = [
+            {
+                'name': person['name'],
+                'character': person['character']
+            }
+            for person in islice(credits.get('cast') or (), 10)  # Limit to top 10 cast
+        ]
+
+        # Get director from crew, stopping at the first match
+        filtered_response['director'] = next(
+            (person['name'] for person in credits.get('crew', []) if person['job'] == 'Director'),
+            None
+        )
+
+    return filtered_response
+
+
+def _project_results(results: List[Dict[str, Any]], overview_limit: int = 150, n: int = 5) -> List[Dict[str, Any]]:
+    """Keep the essential fields of the top n movies, truncating long overviews"""
+    return [
+        {
+            'id': movie.get('id'),
+            'title': movie.get('title'),
+            'release_date': movie.get('release_date'),
+            'vote_average': movie.get('vote_average'),
+            'genres': [GENRE_ID_TO_NAME[genre_id] for genre_id in movie.get('genre_ids', ()) if genre_id in GENRE_ID_TO_NAME],
+            'overview': overview[:overview_limit] + '...' if len(overview := movie.get('overview') or '') > overview_limit else overview
+        }
+        for movie in results[:n]
+    ]
+
+
+def _format_movie_results(response: Dict[str, Any], overview_limit: int = 150) -> Dict[str, Any]:
+    # Filter to only essential fields
+    if 'results' in response:
+        return {
+            'results': _project_results(response['results'], overview_limit),
+            'total_results': min(response.get('total_results', 0), 5)
+        }
+
+    return response
+
+
+def _format_watch_providers(response: Dict[str, Any], movie_id: int, region: str) -> Dict[str, Any]:
+    # TMDB errors pass through so callers (and the response cache) can see them
+    if response.get('success') is False:
+        return response
+
+    # Extract and format providers for specific region
+    if 'results' in response and region in response['results']:
+        providers_data = response['results'][region]
+        
+        # Each category is read once with .get; missing ones come back empty.
+        # flatrate is TMDB's name for streaming/subscription services
+        return {
+            'movie_id': movie_id,
+            'region': region,
+            'streaming': [provider['provider_name'] for provider in providers_data.get('flatrate', ())],
+            'rent': [provider['provider_name'] for provider in providers_data.get('rent', ())],
+            'buy': [provider['provider_name'] for provider in providers_data.get('buy', ())],
+            'link': providers_data.get('link', '')
+        }
+    
+    else:
+        return {
+            'movie_id': movie_id,
+            'region': region,
+            'streaming': [],
+            'rent': [],
+            'buy': [],
+            'message': f'No streaming information available for this movie in {region}',
+            'link': ''
+        }
@@ -1,12 +1,16 @@
 from typing import TypedDict, Annotated, Sequence
 from langchain.chat_models import init_chat_model
 from langchain_core.tools import tool
-from langchain_core.messages import BaseMessage, ToolMessage, SystemMessage
-from langgraph.graph.message import add_messages
+from langchain_core.messages import BaseMessage, ToolMessage, SystemMessage, RemoveMessage
+from langchain_core.runnables import RunnableConfig
+from langgraph.graph.message import add_messages, REMOVE_ALL_MESSAGES
 from langgraph.prebuilt import ToolNode
 from langgraph.graph import StateGraph, START, END
-import requests
-from tools import get_watch_providers, search_movies, get_movie_details, discover_movies, get_movie_lists, get_movie_recommendations, get_trending_movies
+from langgraph.checkpoint.memory import MemorySaver
+from contextlib import asynccontextmanager
+from functools import lru_cache
+import asyncio
+from tools import get_watch_providers, search_movies, get_movie_details, discover_movies, get_movie_lists, get_movie_recommendations, get_trending_movies, get_movie_bundle
 import os
 from dotenv import load_dotenv
 from langchain_groq import ChatGroq
@@ -23,6 +27,7 @@ Available Tools:
 - get_movie_recommendations: Get similar movies
 - get_trending_movies: Get current trending films
 - get_watch_providers: Find where to watch/stream movies
+- get_movie_bundle: Details + recommendations + watch providers for one movie in a single call
 
 Genres: Action(28), Comedy(35), Drama(18), Horror(27), Romance(10749), Sci-Fi(878), etc.
 
@@ -33,6 +38,7 @@ Guidelines:
 - Offer recommendations when appropriate
 - Format responses clearly with key details
 - For "where to watch" queries: search_movies → get_watch_providers
+- When a user wants the full picture on one movie, prefer get_movie_bundle over separate calls
 - Don't answer if not related to your task, then explain why you can't answer this.
 
 Examples: 1. "popular/ trending movies?" → get_trending_movies. 2. For "Where can I watch Inception?" → search_movies → get_watch_providers""")
@@ -50,16 +56,130 @@ llm = ChatGroq(
     api_key=GROQ_API_KEY,
     model=chat_model,  # Excellent for tool calling
     temperature=0.1,
-    max_tokens=2048
+    max_tokens=2048,
+    timeout=float(os.getenv('LLM_TIMEOUT', '60'))
 )
 llm = llm.bind_tools([get_watch_providers, search_movies, get_movie_details,
-                     discover_movies, get_movie_lists, get_movie_recommendations, get_trending_movies])
+                     discover_movies, get_movie_lists, get_movie_recommendations, get_trending_movies,
+                     get_movie_bundle])
 
 #raw_llm = init_chat_model(CHAT_MODEL, model_provider='ollama')
 
-
-def llm_node(state: ChatState) -> ChatState:
-    response = llm.invoke([system_prompt]+state['messages'])
+# Micro-batching of concurrent LLM calls; off by default (LLM_BATCH_SIZE=1)
+LLM_BATCH_SIZE = int(os.getenv('LLM_BATCH_SIZE', '1'))
+# Upper bound on model calls in flight while batching is on
+LLM_MAX_CONCURRENCY = int(os.getenv('LLM_MAX_CONCURRENCY', '16'))
+
+
+class LLMBatcher:
+    """
+    Coalesce LLM calls from concurrent graph runs into abatch calls, with at
+    most max_concurrency calls in flight.
+
+    Callers queue their messages and await a future. Each call holds one of
+    max_concurrency slots while in flight. The worker waits for a free slot,
+    then adds already-queued calls (up to max_batch_size) while slots remain
+    and sends them in one abatch, so a lone call goes out immediately and
+    calls only group up behind saturated slots. Without a running worker (batching
+    disabled, or the CLI) calls go straight to the model.
+    """
+
+    def __init__(self, model, max_batch_size: int = LLM_BATCH_SIZE, max_concurrency: int = LLM_MAX_CONCURRENCY):
+        self.model = model
+        self.max_batch_size = max_batch_size
+        self.max_concurrency = max_concurrency
+        self.queue = None
+        self.slots = None
+        self.worker = None
+        self.pending = set()
+
+    async def start(self):
+        if self.max_batch_size <= 1:
+            return
+        self.queue = asyncio.Queue()
+        self.slots = asyncio.Semaphore(self.max_concurrency)
+        self.worker = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self.worker is None:
+            return
+        # New calls go direct from here on; the sentinel lets the worker flush
+        # everything queued before it
+        worker, self.worker = self.worker, None
+        self.queue.put_nowait(None)
+        await worker
+        if self.pending:
+            await asyncio.gather(*self.pending, return_exceptions=True)
+
+    async def ainvoke(self, messages, config=None):
+        if self.worker is None:
+            return await self.model.ainvoke(messages, config=config)
+        future = asyncio.get_running_loop().create_future()
+        self.queue.put_nowait((future, messages, config))
+        return await future
+
+    async def _run(self):
+        stopping = False
+        while not stopping:
+            item = await self.queue.get()
+            if item is None:
+                break
+            # One slot per call: a batch only grows while slots are free, so
+            # no more than max_concurrency model calls are ever in flight
+            await self.slots.acquire()
+            batch = [item]
+            # Take whatever queued up meanwhile, without waiting for more
+            while len(batch) < self.max_batch_size and not self.queue.empty() and not self.slots.locked():
+                item = self.queue.get_nowait()
+                if item is None:
+                    stopping = True
+                    break
+                await self.slots.acquire()
+                batch.append(item)
+            task = asyncio.create_task(self._dispatch(batch))
+            self.pending.add(task)
+            task.add_done_callback(self.pending.discard)
+
+    async def _dispatch(self, batch):
+        futures = [future for future, _, _ in batch]
+        # Per-call configs keep each graph run's callbacks (tracing, token streaming)
+        try:
+            results = await self.model.abatch(
+                [messages for _, messages, _ in batch],
+                config=[config or {} for _, _, config in batch],
+                return_exceptions=True
+            )
+        except Exception as e:
+            results = [e] * len(batch)
+        finally:
+            for _ in batch:
+                self.slots.release()
+        for future, result in zip(futures, results):
+            if future.done():
+                continue
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+
+llm_batcher = LLMBatcher(llm)
+
+
+def has_system_prompt(state: ChatState):
+    messages = state['messages']
+    return 'llm' if messages and isinstance(messages[0], SystemMessage) else 'prepend_system'
+
+
+def prepend_system(state: ChatState) -> ChatState:
+    # Runs once per thread: rebuild the history with the system prompt first so
+    # llm_node can pass state['messages'] as-is instead of copying it every step
+    return {'messages': [RemoveMessage(id=REMOVE_ALL_MESSAGES),
+                         SystemMessage(content=system_prompt.content), *state['messages']]}
+
+
+async def llm_node(state: ChatState, config: RunnableConfig) -> ChatState:
+    response = await llm_batcher.ainvoke(state['messages'], config)
     return {'messages': [response]}
 
 
@@ -79,7 +199,7 @@ def router(state: ChatState) -> ChatState:
 
 
 tool_node = ToolNode([get_watch_providers,  search_movies, get_movie_details, discover_movies,
-                     get_movie_lists, get_movie_recommendations, get_trending_movies])
+                     get_movie_lists, get_movie_recommendations, get_trending_movies, get_movie_bundle])
 
 
 def tools_node(state):
@@ -92,14 +212,36 @@ def tools_node(state):
 
 
 builder = StateGraph(ChatState)
+builder.add_node('prepend_system', prepend_system)
 builder.add_node('llm', llm_node)
 builder.add_node('tools', tool_node)
-builder.add_edge(START, 'llm')
+builder.add_conditional_edges(START, has_system_prompt, ['prepend_system', 'llm'])
+builder.add_edge('prepend_system', 'llm')
 builder.add_edge('tools', 'llm')
 builder.add_conditional_edges('llm', should_continue, {
                               'continue': 'tools', 'end': END})
 
-graph = builder.compile()
+@lru_cache(maxsize=None)
+def get_graph(checkpointer=None):
+    """Compile the graph once per checkpointer and reuse it"""
+    return builder.compile(checkpointer=checkpointer)
+
+
+@asynccontextmanager
+async def open_graph(redis_url=None, ttl=None):
+    """
+    Compile the graph with a checkpointer so conversation state is kept per
+    thread_id. Uses Redis when a URL is given, otherwise process memory.
+    ttl (seconds) lets Redis expire idle threads along with their sessions.
+    """
+    if redis_url:
+        from langgraph.checkpoint.redis.aio import AsyncRedisSaver
+        ttl_config = {'default_ttl': ttl / 60, 'refresh_on_read': True} if ttl else None
+        async with AsyncRedisSaver.from_conn_string(redis_url, ttl=ttl_config) as checkpointer:
+            await checkpointer.asetup()
+            yield get_graph(checkpointer)
+    else:
+        yield get_graph(MemorySaver())
 
 
 def print_stream(stream):
@@ -111,7 +253,8 @@ def print_stream(stream):
             message.pretty_print()
 
 
-if __name__ == '__main__':
+async def chat_loop():
+    graph = get_graph()
     state = {'messages': []}
 
     print('Type an instruction or "quit".\n')
@@ -127,8 +270,12 @@ if __name__ == '__main__':
         state['messages'].append(HumanMessage(content=user_message))
 
         # Get response and update state
-        result = graph.invoke(state)
+        result = await graph.ainvoke(state)
         state = result  # Update state with the complete result
 
         # Print only the last message (AI response)
         print(state['messages'][-1].content, '\n')
+
+
+if __name__ == '__main__':
+    asyncio.run(chat_loop())
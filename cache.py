@@ -0,0 +1,131 @@
+import time
+import asyncio
+import logging
+from functools import wraps
+from typing import List, Optional
+import orjson
+from fastapi import Request, Response
+
+logger = logging.getLogger(__name__)
+
+
+class ResponseCache:
+    """
+    TTL cache for serialized JSON payloads. Uses Redis (SETEX) when a client
+    is given so every worker shares entries, otherwise a bounded in-process dict.
+    Redis errors fail open: a failed read is a miss and a failed write is skipped.
+    """
+
+    def __init__(self, redis=None, max_entries: int = 1024):
+        self.redis = redis
+        self.max_entries = max_entries
+        self.entries = {}
+
+    async def get(self, key: str) -> Optional[bytes]:
+        if self.redis is not None:
+            try:
+                return await self.redis.get(key)
+            except Exception as e:
+                logger.error(f"Response cache read failed: {e}")
+                return None
+
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        expires_at, payload = entry
+        if expires_at < time.monotonic():
+            del self.entries[key]
+            return None
+        return payload
+
+    async def set(self, key: str, payload: bytes, ttl: int) -> None:
+        if self.redis is not None:
+            try:
+                await self.redis.setex(key, ttl, payload)
+            except Exception as e:
+                logger.error(f"Response cache write failed: {e}")
+            return
+
+        if len(self.entries) >= self.max_entries:
+            # Drop the oldest entry
+            self.entries.pop(next(iter(self.entries)))
+        self.entries[key] = (time.monotonic() + ttl, payload)
+
+
+def cache_response(ttl: int):
+    """
+    Cache an endpoint's JSON result for ttl seconds, keyed by endpoint name and
+    arguments. TMDB error payloads (flagged 'success': False by the tools) are
+    passed through without being cached.
+    """
+    def decorator(func):
+        @wraps(func)
+        async def wrapper(request: Request, **kwargs):
+            cache: ResponseCache = request.app.state.cache
+            key = f"tmdb:{func.__name__}:" + ":".join(f"{k}={v}" for k, v in sorted(kwargs.items()))
+
+            payload = await cache.get(key)
+            if payload is None:
+                result = await func(request, **kwargs)
+                payload = orjson.dumps(result)
+                if not (isinstance(result, dict) and result.get('success') is False):
+                    await cache.set(key, payload, ttl)
+
+            return Response(content=payload, media_type="application/json")
+        return wrapper
+    return decorator
+
+
+class SemanticChatCache:
+    """
+    Semantic cache for chat replies in Redis vector search. Near-duplicate
+    prompts (cosine distance under the threshold) return the stored reply.
+    The prompt is embedded once, in a worker thread, and the vector is reused
+    for both the lookup and the store. Redis errors fail open to a miss.
+    """
+
+    def __init__(self, cache, vectorizer):
+        self.cache = cache
+        self.vectorizer = vectorizer
+
+    async def embed(self, prompt: str) -> Optional[List[float]]:
+        """Embed off the event loop (sentence-transformers encode is synchronous)"""
+        try:
+            return await asyncio.to_thread(self.vectorizer.embed, prompt)
+        except Exception as e:
+            logger.error(f"Semantic cache embed failed: {e}")
+            return None
+
+    async def check(self, prompt: str, vector: List[float]) -> Optional[str]:
+        try:
+            hits = await self.cache.acheck(prompt=prompt, vector=vector, num_results=1)
+        except Exception as e:
+            logger.error(f"Semantic cache lookup failed: {e}")
+            return None
+        return hits[0]["response"] if hits else None
+
+    async def store(self, prompt: str, response: str, vector: List[float]) -> None:
+        try:
+            await self.cache.astore(prompt=prompt, response=response, vector=vector)
+        except Exception as e:
+            logger.error(f"Semantic cache store failed: {e}")
+
+
+def create_semantic_cache(redis_url: str, distance_threshold: float = 0.12, ttl: int = 3600) -> SemanticChatCache:
+    """
+    Build the chat semantic cache. Entries expire after ttl seconds so answers
+    to time-sensitive prompts (trending, now playing) don't live forever.
+    Needs the optional redisvl and sentence-transformers packages.
+    """
+    from redisvl.extensions.llmcache import SemanticCache
+    from redisvl.utils.vectorize import HFTextVectorizer
+
+    vectorizer = HFTextVectorizer("sentence-transformers/all-MiniLM-L6-v2")
+    cache = SemanticCache(
+        name="movie_chat",
+        redis_url=redis_url,
+        distance_threshold=distance_threshold,
+        ttl=ttl,
+        vectorizer=vectorizer
+    )
+    return SemanticChatCache(cache, vectorizer)
@@ -1,52 +1,52 @@
-from fastapi import FastAPI, HTTPException, Depends, Request
+from fastapi import FastAPI, HTTPException, Depends, Request, Response
+from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse, StreamingResponse
+import anyio
 from pydantic import BaseModel, Field
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Annotated
+import msgspec
 import uuid
+import orjson
+import asyncio
 from datetime import datetime
 import logging
 from contextlib import asynccontextmanager
-import asyncio
-from concurrent.futures import ThreadPoolExecutor
 import json
 import os
 from dotenv import load_dotenv
-from slowapi import Limiter, _rate_limit_exceeded_handler
-from slowapi.util import get_remote_address
-from slowapi.errors import RateLimitExceeded
 
 # Load environment variables
 load_dotenv()
 
 # Import your agent
-from agent import graph
-from langchain_core.messages import HumanMessage
+from agent import open_graph, llm_batcher
+from sessions import RedisSessionStore, MemorySessionStore, SESSION_TTL
+from cache import ResponseCache, cache_response, create_semantic_cache
+from ratelimit import Limiter, RateLimitExceeded, get_remote_address
+from tools import (create_http_client, set_http_client, set_redis_client, close_http_client, search_movies, get_movie_lists, get_movie_details, get_watch_providers,
+                   get_movie_recommendations, get_trending_movies, discover_movies)
+from langchain_core.messages import HumanMessage, AIMessage
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# In-memory session storage (use Redis/Database in production)
-chat_sessions: Dict[str, Dict] = {}
-
-# Thread pool for running synchronous agent
-executor = ThreadPoolExecutor(max_workers=4)
+# Bound once; these are called on every request
+_now = datetime.now
+_uuid = uuid.uuid4
 
-# Rate limiter configuration with Redis URL for production
+# Redis URL for production (sessions, caching, rate limits)
 REDIS_URL = os.getenv('REDIS_URL', None)
-if REDIS_URL:
-    from slowapi.middleware import SlowAPIMiddleware
-    limiter = Limiter(
-        key_func=get_remote_address,
-        storage_uri=REDIS_URL,
-        default_limits=["1000/hour", "100/minute"]
-    )
-else:
-    # Fallback to in-memory for development
-    limiter = Limiter(
-        key_func=get_remote_address,
-        default_limits=["1000/hour", "100/minute"]
-    )
+
+# Rate limiter; counters move to Redis in lifespan when REDIS_URL is set,
+# otherwise they stay in memory for development
+limiter = Limiter(key_func=get_remote_address)
+
+# Semantic cache for repeated chat prompts (requires Redis)
+SEMANTIC_CACHE_ENABLED = os.getenv('SEMANTIC_CACHE_ENABLED', 'False').lower() in ('true', '1', 'yes', 'on')
+SEMANTIC_CACHE_THRESHOLD = float(os.getenv('SEMANTIC_CACHE_THRESHOLD', '0.12'))
+SEMANTIC_CACHE_TTL = int(os.getenv('SEMANTIC_CACHE_TTL', '3600'))
 
 # FastAPI Configuration from Environment Variables
 FASTAPI_HOST = os.getenv('FASTAPI_HOST', '0.0.0.0')
@@ -54,6 +54,34 @@ FASTAPI_PORT = int(os.getenv('FASTAPI_PORT', '8000'))
 FASTAPI_RELOAD = os.getenv('FASTAPI_RELOAD', 'True').lower() in ('true', '1', 'yes', 'on')
 FASTAPI_DEBUG = os.getenv('FASTAPI_DEBUG', 'False').lower() in ('true', '1', 'yes', 'on')
 FASTAPI_LOG_LEVEL = os.getenv('FASTAPI_LOG_LEVEL', 'info').lower()
+# Worker processes. Sessions and agent state are per-process without Redis, so
+# a single worker is used unless REDIS_URL is set (reload is always single-worker)
+FASTAPI_WORKERS = 1 if FASTAPI_RELOAD or not REDIS_URL else int(os.getenv('WEB_CONCURRENCY', os.cpu_count() or 1))
+
+# Static part of the health check environment info
+_ENV_INFO = {
+    "host": FASTAPI_HOST,
+    "port": FASTAPI_PORT,
+    "reload": FASTAPI_RELOAD,
+    "debug": FASTAPI_DEBUG,
+    "log_level": FASTAPI_LOG_LEVEL
+}
+
+# How often idle sessions are swept, in seconds
+SESSION_GC_INTERVAL = int(os.getenv('SESSION_GC_INTERVAL', '60'))
+
+async def session_gc_loop(app: FastAPI):
+    """Periodically drop expired sessions and their agent threads"""
+    while True:
+        await asyncio.sleep(SESSION_GC_INTERVAL)
+        try:
+            expired = await app.state.sessions.expire_sessions()
+            for session_id in expired:
+                await app.state.graph.checkpointer.adelete_thread(session_id)
+            if expired:
+                logger.info(f"Expired {len(expired)} idle sessions")
+        except Exception as e:
+            logger.error(f"Session GC error: {e}")
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -63,9 +91,37 @@ async def lifespan(app: FastAPI):
     logger.info(f"🔌 Port: {FASTAPI_PORT}")
     logger.info(f"🔄 Reload: {FASTAPI_RELOAD}")
     logger.info(f"🐛 Debug: {FASTAPI_DEBUG}")
-    yield
-    logger.info("🎬 Movie Assistant API Shutting down...")
-    executor.shutdown(wait=True)
+    # One pooled HTTP/2 client shared by every TMDB tool call
+    app.state.http = create_http_client()
+    set_http_client(app.state.http)
+    async with open_graph(REDIS_URL, ttl=SESSION_TTL) as graph:
+        app.state.graph = graph
+        if REDIS_URL:
+            import redis.asyncio as redis
+            redis_client = redis.from_url(REDIS_URL)
+            app.state.sessions = RedisSessionStore(redis_client)
+            app.state.cache = ResponseCache(redis_client)
+            limiter.setup(redis_client)
+            set_redis_client(redis_client)
+            app.state.semantic_cache = (
+                create_semantic_cache(REDIS_URL, SEMANTIC_CACHE_THRESHOLD, SEMANTIC_CACHE_TTL) if SEMANTIC_CACHE_ENABLED else None
+            )
+        else:
+            # Fallback to in-memory sessions and cache for development
+            redis_client = None
+            app.state.sessions = MemorySessionStore()
+            app.state.cache = ResponseCache()
+            app.state.semantic_cache = None
+        await llm_batcher.start()
+        gc_task = asyncio.create_task(session_gc_loop(app))
+        yield
+        logger.info("🎬 Movie Assistant API Shutting down...")
+        gc_task.cancel()
+        await llm_batcher.stop()
+        if redis_client is not None:
+            set_redis_client(None)
+            await redis_client.aclose()
+    await close_http_client()
 
 # Initialize FastAPI app
 app = FastAPI(
@@ -73,12 +129,12 @@ app = FastAPI(
     description="AI-powered movie recommendation and information API using TMDB",
     version="1.0.0",
     debug=FASTAPI_DEBUG,
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
 )
 
 # Add rate limiting to app state
 app.state.limiter = limiter
-app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
 
 # CORS middleware for mobile app
 # Production: Replace "*" with specific domains
@@ -95,7 +151,7 @@ app.add_middleware(
 class ChatMessage(BaseModel):
     role: str = Field(..., description="Message role: 'user' or 'assistant'")
     content: str = Field(..., description="Message content")
-    timestamp: datetime = Field(default_factory=datetime.now)
+    timestamp: datetime = Field(default_factory=_now)
 
 class ChatRequest(BaseModel):
     message: str = Field(..., min_length=1, max_length=1000, description="User message")
@@ -105,7 +161,7 @@ class ChatResponse(BaseModel):
     response: str = Field(..., description="AI assistant response")
     session_id: str = Field(..., description="Session ID for conversation continuity")
     message_id: str = Field(..., description="Unique message ID")
-    timestamp: datetime = Field(default_factory=datetime.now)
+    timestamp: datetime = Field(default_factory=_now)
 
 class SessionInfo(BaseModel):
     session_id: str
@@ -131,54 +187,51 @@ class RateLimitResponse(BaseModel):
     retry_after: int
     timestamp: datetime
 
-# Utility functions
-def create_session_id() -> str:
-    """Generate unique session ID"""
-    return str(uuid.uuid4())
-
-def get_or_create_session(session_id: Optional[str] = None) -> str:
-    """Get existing session or create new one"""
-    if session_id and session_id in chat_sessions:
-        # Update last activity
-        chat_sessions[session_id]['last_activity'] = datetime.now()
-        return session_id
-    
-    # Create new session
-    new_session_id = create_session_id()
-    chat_sessions[new_session_id] = {
-        'messages': [],
-        'created_at': datetime.now(),
-        'last_activity': datetime.now(),
-        'state': {'messages': []}
-    }
-    return new_session_id
+# Hot-path request body, decoded by msgspec in a single C pass; the Pydantic
+# ChatRequest above stays as the documented OpenAPI schema
+class ChatRequestBody(msgspec.Struct):
+    message: Annotated[str, msgspec.Meta(min_length=1, max_length=1000)]
+    session_id: Optional[str] = None
 
-async def run_agent_async(state: Dict) -> Dict:
-    """Run the agent in a thread pool to avoid blocking"""
-    loop = asyncio.get_event_loop()
+_chat_request_decoder = msgspec.json.Decoder(ChatRequestBody)
+
+async def chat_request_body(request: Request) -> ChatRequestBody:
+    """Decode and validate the chat request body"""
     try:
-        result = await loop.run_in_executor(executor, graph.invoke, state)
-        return result
-    except Exception as e:
-        logger.error(f"Agent execution error: {e}")
-        raise HTTPException(status_code=500, detail=f"Agent processing failed: {str(e)}")
+        return _chat_request_decoder.decode(await request.body())
+    except msgspec.DecodeError as e:
+        # Raised as a validation error so FastAPI answers with its usual 422 body;
+        # msgspec.ValidationError (bad field values) is a DecodeError subclass
+        error_type = "value_error" if isinstance(e, msgspec.ValidationError) else "json_invalid"
+        raise RequestValidationError([{"type": error_type, "loc": ("body",), "msg": str(e), "input": None}])
+
+_CHAT_REQUEST_DOCS = {
+    "requestBody": {
+        "required": True,
+        "content": {"application/json": {"schema": ChatRequest.model_json_schema()}}
+    }
+}
 
 # Custom rate limit exception handler
 @app.exception_handler(RateLimitExceeded)
 async def rate_limit_handler(request: Request, exc: RateLimitExceeded):
-    response = RateLimitResponse(
-        error="Rate limit exceeded",
-        message=f"Too many requests. Limit: {exc.detail}",
-        limit=exc.detail,
-        retry_after=60,  # seconds
-        timestamp=datetime.now()
+    return ORJSONResponse(
+        status_code=429,
+        content={
+            "error": "Rate limit exceeded",
+            "message": f"Too many requests. Limit: {exc.detail}",
+            "limit": exc.detail,
+            "retry_after": exc.retry_after,  # seconds
+            "timestamp": _now()
+        },
+        headers={"Retry-After": str(exc.retry_after)}
     )
-    return HTTPException(status_code=429, detail=response.dict())
 
 # Security and validation
 def validate_environment():
     """Validate required environment variables"""
-    required_vars = ['tmdb_api_key']
+    # TMDB accepts either a v4 read token (preferred) or a v3 API key
+    required_vars = ['tmdb_read_token' if os.getenv('tmdb_read_token') else 'tmdb_api_key']
     missing_vars = [var for var in required_vars if not os.getenv(var)]
     if missing_vars:
         raise ValueError(f"Missing required environment variables: {missing_vars}")
@@ -198,87 +251,98 @@ async def add_security_headers(request: Request, call_next):
 
 # API Endpoints
 
-@app.get("/", response_model=HealthResponse)
+# Responses below are built from trusted server-side values, so they skip
+# response_model validation; the models are kept for the OpenAPI docs.
+
+# Health payload encoded once, open at the end of "environment" so the
+# handlers only append the per-request fields
+_HEALTH_PREFIX = orjson.dumps({
+    "status": "healthy",
+    "version": "1.0.0",
+    "environment": _ENV_INFO
+})[:-2]
+
+def _timestamp_suffix() -> bytes:
+    return b',"timestamp":' + orjson.dumps(_now()) + b'}'
+
+@app.get("/", responses={200: {"model": HealthResponse}})
 @limiter.limit("100/minute")
 async def root(request: Request):
     """Health check endpoint with environment info"""
-    return HealthResponse(
-        status="healthy",
-        timestamp=datetime.now(),
-        version="1.0.0",
-        environment={
-            "host": FASTAPI_HOST,
-            "port": FASTAPI_PORT,
-            "reload": FASTAPI_RELOAD,
-            "debug": FASTAPI_DEBUG,
-            "log_level": FASTAPI_LOG_LEVEL
-        }
-    )
+    return Response(content=_HEALTH_PREFIX + b'}' + _timestamp_suffix(), media_type="application/json")
 
-@app.get("/health", response_model=HealthResponse)
+@app.get("/health", responses={200: {"model": HealthResponse}})
 @limiter.limit("100/minute")
 async def health_check(request: Request):
     """Detailed health check"""
-    return HealthResponse(
-        status="healthy",
-        timestamp=datetime.now(),
-        version="1.0.0",
-        environment={
-            "host": FASTAPI_HOST,
-            "port": FASTAPI_PORT,
-            "reload": FASTAPI_RELOAD,
-            "debug": FASTAPI_DEBUG,
-            "log_level": FASTAPI_LOG_LEVEL,
-            "active_sessions": len(chat_sessions),
-            "total_messages": sum(len(session['messages']) for session in chat_sessions.values())
-        }
-    )
+    stats = await request.app.state.sessions.stats()
+    session_info = b',"active_sessions":%d,"total_messages":%d}' % (stats['active_sessions'], stats['total_messages'])
+    return Response(content=_HEALTH_PREFIX + session_info + _timestamp_suffix(), media_type="application/json")
 
-@app.post("/chat", response_model=ChatResponse)
+@app.post("/chat", responses={200: {"model": ChatResponse}}, openapi_extra=_CHAT_REQUEST_DOCS)
 @limiter.limit("10/minute")  # 10 chat messages per minute per IP
-async def chat_with_agent(request: Request, chat_request: ChatRequest):
+async def chat_with_agent(request: Request, chat_request: ChatRequestBody = Depends(chat_request_body)):
     """
     Main chat endpoint for movie recommendations and information
     Rate limited to 10 requests per minute to prevent abuse of AI processing
     """
     try:
+        sessions = request.app.state.sessions
+        graph = request.app.state.graph
+        semantic_cache = request.app.state.semantic_cache
+
+        # Only opening prompts are shared through the semantic cache; follow-ups
+        # depend on the conversation so far
+        use_semantic_cache = semantic_cache is not None and not (
+            chat_request.session_id and await sessions.exists(chat_request.session_id))
+
         # Get or create session
-        session_id = get_or_create_session(chat_request.session_id)
-        session = chat_sessions[session_id]
+        session_id = await sessions.get_or_create(chat_request.session_id)
+        config = {"configurable": {"thread_id": session_id}}
         
-        # Add user message to session
-        user_message = ChatMessage(role="user", content=chat_request.message)
-        session['messages'].append(user_message.dict())
+        # Add user message to session (stored pre-encoded, served as-is)
+        await sessions.append_message(session_id, orjson.dumps(
+            {"role": "user", "content": chat_request.message, "timestamp": _now()}))
         
-        # Prepare agent state
-        agent_state = session['state'].copy()
-        agent_state['messages'].append(HumanMessage(content=chat_request.message))
-        
-        # Run agent
-        logger.info(f"Processing message for session {session_id}: {chat_request.message[:50]}...")
-        result = await run_agent_async(agent_state)
-        
-        # Extract AI response
-        ai_response = result['messages'][-1].content
-        
-        # Update session state
-        session['state'] = result
+        # Embedded once and reused for the store on a miss
+        vector = await semantic_cache.embed(chat_request.message) if use_semantic_cache else None
+        ai_response = await semantic_cache.check(chat_request.message, vector) if vector is not None else None
+        if ai_response:
+            # Record the turn in the thread so follow-up questions keep their context
+            await graph.aupdate_state(config, {'messages': [
+                HumanMessage(content=chat_request.message), AIMessage(content=ai_response)]}, as_node='llm')
+            logger.info(f"Semantic cache hit for session {session_id}")
+        else:
+            # Prior turns are restored by the checkpointer from the thread_id
+            agent_state = {'messages': [HumanMessage(content=chat_request.message)]}
+            
+            # Run agent
+            logger.info(f"Processing message for session {session_id}: {chat_request.message[:50]}...")
+            try:
+                result = await graph.ainvoke(agent_state, config=config)
+            except Exception as e:
+                logger.error(f"Agent execution error: {e}")
+                raise HTTPException(status_code=500, detail=f"Agent processing failed: {str(e)}")
+            
+            # Extract AI response
+            ai_response = result['messages'][-1].content
+            if vector is not None and ai_response:
+                await semantic_cache.store(chat_request.message, ai_response, vector)
         
         # Add AI response to session history
-        ai_message = ChatMessage(role="assistant", content=ai_response)
-        session['messages'].append(ai_message.dict())
-        session['last_activity'] = datetime.now()
+        await sessions.append_message(session_id, orjson.dumps(
+            {"role": "assistant", "content": ai_response, "timestamp": _now()}))
         
-        message_id = str(uuid.uuid4())
+        message_id = _uuid().hex
         
         logger.info(f"Response generated for session {session_id}")
         
-        return ChatResponse(
-            response=ai_response,
-            session_id=session_id,
-            message_id=message_id,
-            timestamp=datetime.now()
-        )
+        return ORJSONResponse({
+            "response": ai_response,
+            "session_id": session_id,
+            "message_id": message_id,
+            "timestamp": _now()
+        })
         
     except HTTPException:
         raise
@@ -286,56 +350,100 @@ async def chat_with_agent(request: Request, chat_request: ChatRequest):
         logger.error(f"Chat endpoint error: {e}")
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
-@app.get("/sessions", response_model=List[SessionInfo])
+def sse_event(data: dict) -> str:
+    """Format a Server-Sent Events data frame"""
+    return f"data: {orjson.dumps(data).decode()}\n\n"
+
+@app.post("/chat/stream", openapi_extra=_CHAT_REQUEST_DOCS)
+@limiter.limit("10/minute")  # Same budget as /chat
+async def chat_with_agent_stream(request: Request, chat_request: ChatRequestBody = Depends(chat_request_body)):
+    """
+    Streaming variant of /chat using Server-Sent Events.
+    Emits a session event, {"delta": ...} frames as tokens arrive, then a done event.
+    """
+    sessions = request.app.state.sessions
+    graph = request.app.state.graph
+
+    session_id = await sessions.get_or_create(chat_request.session_id)
+    await sessions.append_message(session_id, orjson.dumps(
+        {"role": "user", "content": chat_request.message, "timestamp": _now()}))
+
+    agent_state = {'messages': [HumanMessage(content=chat_request.message)]}
+    config = {"configurable": {"thread_id": session_id}}
+
+    async def event_stream():
+        # Every delta sent to the client, across all model turns (tool-calling
+        # turns can emit text too), so the stored reply matches what was shown
+        chunks = []
+        try:
+            yield sse_event({"session_id": session_id})
+            async for event in graph.astream_events(agent_state, config=config, version="v2"):
+                if event["event"] == "on_chat_model_stream":
+                    delta = event["data"]["chunk"].content
+                    if delta:
+                        chunks.append(delta)
+                        yield sse_event({"delta": delta})
+            yield sse_event({"done": True, "session_id": session_id, "message_id": _uuid().hex})
+        except Exception as e:
+            logger.error(f"Chat stream error: {e}")
+            yield sse_event({"error": f"Agent processing failed: {str(e)}"})
+        finally:
+            if chunks:
+                # Shielded so the reply is saved even if the client disconnected
+                with anyio.CancelScope(shield=True):
+                    await sessions.append_message(session_id, orjson.dumps(
+                        {"role": "assistant", "content": "".join(chunks), "timestamp": _now()}))
+
+    logger.info(f"Streaming message for session {session_id}: {chat_request.message[:50]}...")
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.get("/sessions", responses={200: {"model": List[SessionInfo]}})
 @limiter.limit("20/minute")
 async def get_sessions(request: Request):
     """Get all active sessions (for debugging/monitoring)"""
-    sessions = []
-    for session_id, session_data in chat_sessions.items():
-        sessions.append(SessionInfo(
-            session_id=session_id,
-            created_at=session_data['created_at'],
-            last_activity=session_data['last_activity'],
-            message_count=len(session_data['messages'])
-        ))
-    return sessions
-
-@app.get("/sessions/{session_id}/messages", response_model=List[ChatMessage])
+    return ORJSONResponse(await request.app.state.sessions.list_sessions())
+
+@app.get("/sessions/{session_id}/messages", responses={200: {"model": List[ChatMessage]}})
 @limiter.limit("30/minute")
 async def get_session_messages(request: Request, session_id: str):
     """Get conversation history for a session"""
-    if session_id not in chat_sessions:
+    sessions = request.app.state.sessions
+    if not await sessions.exists(session_id):
         raise HTTPException(status_code=404, detail="Session not found")
     
-    return [ChatMessage(**msg) for msg in chat_sessions[session_id]['messages']]
+    return Response(content=await sessions.get_messages_json(session_id), media_type="application/json")
 
 @app.delete("/sessions/{session_id}")
 @limiter.limit("10/minute")
 async def delete_session(request: Request, session_id: str):
     """Delete a chat session"""
-    if session_id not in chat_sessions:
+    if not await request.app.state.sessions.delete(session_id):
         raise HTTPException(status_code=404, detail="Session not found")
     
-    del chat_sessions[session_id]
+    await request.app.state.graph.checkpointer.adelete_thread(session_id)
     return {"message": f"Session {session_id} deleted successfully"}
 
 @app.delete("/sessions")
 @limiter.limit("5/minute")  # More restrictive for clearing all sessions
 async def clear_all_sessions(request: Request):
     """Clear all chat sessions (for debugging)"""
-    chat_sessions.clear()
+    checkpointer = request.app.state.graph.checkpointer
+    for session_id in await request.app.state.sessions.clear():
+        await checkpointer.adelete_thread(session_id)
     return {"message": "All sessions cleared"}
 
 @app.post("/sessions/{session_id}/reset")
 @limiter.limit("15/minute")
 async def reset_session(request: Request, session_id: str):
     """Reset a session's conversation history"""
-    if session_id not in chat_sessions:
+    if not await request.app.state.sessions.reset(session_id):
         raise HTTPException(status_code=404, detail="Session not found")
     
-    chat_sessions[session_id]['messages'] = []
-    chat_sessions[session_id]['state'] = {'messages': []}
-    chat_sessions[session_id]['last_activity'] = datetime.now()
+    await request.app.state.graph.checkpointer.adelete_thread(session_id)
     
     return {"message": f"Session {session_id} reset successfully"}
 
@@ -345,74 +453,73 @@ async def reset_session(request: Request, session_id: str):
 async def search_movies_endpoint(request: Request, query: str):
     """Quick movie search endpoint"""
     try:
-        from tools import search_movies
-        result = search_movies.invoke({"query": query})
-        return result
+        result = await search_movies.ainvoke({"query": query})
+        return ORJSONResponse(result)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/movies/popular")
 @limiter.limit("60/minute")  # Popular movies can be cached, allow more requests
+@cache_response(ttl=600)
 async def get_popular_movies(request: Request):
     """Get popular movies"""
     try:
-        from tools import get_movie_lists
-        result = get_movie_lists.invoke({"list_type": "popular"})
+        result = await get_movie_lists.ainvoke({"list_type": "popular"})
         return result
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/movies/top-rated")
 @limiter.limit("60/minute")
+@cache_response(ttl=600)
 async def get_top_rated_movies(request: Request):
     """Get top rated movies"""
     try:
-        from tools import get_movie_lists
-        result = get_movie_lists.invoke({"list_type": "top_rated"})
+        result = await get_movie_lists.ainvoke({"list_type": "top_rated"})
         return result
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/movies/now-playing")
 @limiter.limit("60/minute")
+@cache_response(ttl=600)
 async def get_now_playing_movies(request: Request):
     """Get now playing movies"""
     try:
-        from tools import get_movie_lists
-        result = get_movie_lists.invoke({"list_type": "now_playing"})
+        result = await get_movie_lists.ainvoke({"list_type": "now_playing"})
         return result
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/movies/upcoming")
 @limiter.limit("60/minute")
+@cache_response(ttl=600)
 async def get_upcoming_movies(request: Request):
     """Get upcoming movies"""
     try:
-        from tools import get_movie_lists
-        result = get_movie_lists.invoke({"list_type": "upcoming"})
+        result = await get_movie_lists.ainvoke({"list_type": "upcoming"})
         return result
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/movies/{movie_id}/details")
 @limiter.limit("50/minute")  # Movie details are specific lookups
+@cache_response(ttl=86400)
 async def get_movie_details_endpoint(request: Request, movie_id: int):
     """Get detailed movie information"""
     try:
-        from tools import get_movie_details
-        result = get_movie_details.invoke({"movie_id": movie_id})
+        result = await get_movie_details.ainvoke({"movie_id": movie_id})
         return result
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/movies/{movie_id}/watch-providers")
 @limiter.limit("40/minute")  # Watch providers involve external API calls
+@cache_response(ttl=3600)
 async def get_watch_providers_endpoint(request: Request, movie_id: int, region: str = "US"):
     """Get streaming/watch providers for a movie"""
     try:
-        from tools import get_watch_providers
-        result = get_watch_providers.invoke({"movie_id": movie_id, "region": region})
+        result = await get_watch_providers.ainvoke({"movie_id": movie_id, "region": region})
         return result
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -422,19 +529,18 @@ async def get_watch_providers_endpoint(request: Request, movie_id: int, region:
 async def get_movie_recommendations_endpoint(request: Request, movie_id: int):
     """Get movie recommendations"""
     try:
-        from tools import get_movie_recommendations
-        result = get_movie_recommendations.invoke({"movie_id": movie_id})
-        return result
+        result = await get_movie_recommendations.ainvoke({"movie_id": movie_id})
+        return ORJSONResponse(result)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/movies/trending/{time_window}")
 @limiter.limit("50/minute")
+@cache_response(ttl=600)
 async def get_trending_movies_endpoint(request: Request, time_window: str = "day"):
     """Get trending movies (day/week)"""
     try:
-        from tools import get_trending_movies
-        result = get_trending_movies.invoke({"time_window": time_window})
+        result = await get_trending_movies.ainvoke({"time_window": time_window})
         return result
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -448,68 +554,49 @@ async def discover_movies_endpoint(
 ):
     """Discover movies by genre and sorting"""
     try:
-        from tools import discover_movies
-        result = discover_movies.invoke({"genre_id": genre_id, "sort_by": sort_by})
-        return result
+        result = await discover_movies.ainvoke({"genre_id": genre_id, "sort_by": sort_by})
+        return ORJSONResponse(result)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+# Static rate limit info shared by /config and /rate-limits
+_RATE_LIMITS_INFO = {
+    "rate_limits": {
+        "chat": "10/minute - AI chat processing",
+        "search": "30/minute - Movie search",
+        "popular_movies": "60/minute - Popular/trending lists",
+        "movie_details": "50/minute - Detailed movie info",
+        "watch_providers": "40/minute - Streaming availability",
+        "recommendations": "30/minute - Movie recommendations",
+        "sessions": "20/minute - Session management",
+        "health": "100/minute - Health checks"
+    },
+    "note": "Rate limits are per IP address per minute",
+    "android_app_tips": [
+        "Cache popular movies locally",
+        "Implement retry logic with exponential backoff",
+        "Show loading states during API calls",
+        "Handle 429 errors gracefully"
+    ]
+}
+
+# Both payloads are fully static, so they are encoded once at startup
+_CONFIG_BYTES = orjson.dumps({"server_config": _ENV_INFO, **_RATE_LIMITS_INFO})
+_RATE_LIMITS_BYTES = orjson.dumps(_RATE_LIMITS_INFO)
+
 # Configuration endpoint
 @app.get("/config")
 @limiter.limit("10/minute")
 async def get_config(request: Request):
     """Get API configuration information"""
-    return {
-        "server_config": {
-            "host": FASTAPI_HOST,
-            "port": FASTAPI_PORT,
-            "reload": FASTAPI_RELOAD,
-            "debug": FASTAPI_DEBUG,
-            "log_level": FASTAPI_LOG_LEVEL
-        },
-        "rate_limits": {
-            "chat": "10/minute - AI chat processing",
-            "search": "30/minute - Movie search",
-            "popular_movies": "60/minute - Popular/trending lists",
-            "movie_details": "50/minute - Detailed movie info",
-            "watch_providers": "40/minute - Streaming availability",
-            "recommendations": "30/minute - Movie recommendations",
-            "sessions": "20/minute - Session management",
-            "health": "100/minute - Health checks"
-        },
-        "note": "Rate limits are per IP address per minute",
-        "android_app_tips": [
-            "Cache popular movies locally",
-            "Implement retry logic with exponential backoff",
-            "Show loading states during API calls",
-            "Handle 429 errors gracefully"
-        ]
-    }
+    return Response(content=_CONFIG_BYTES, media_type="application/json")
 
 # Rate limiting info endpoint (kept for backward compatibility)
 @app.get("/rate-limits")
 @limiter.limit("10/minute")
 async def get_rate_limits(request: Request):
     """Get information about current rate limits"""
-    return {
-        "rate_limits": {
-            "chat": "10/minute - AI chat processing",
-            "search": "30/minute - Movie search",
-            "popular_movies": "60/minute - Popular/trending lists",
-            "movie_details": "50/minute - Detailed movie info",
-            "watch_providers": "40/minute - Streaming availability",
-            "recommendations": "30/minute - Movie recommendations",
-            "sessions": "20/minute - Session management",
-            "health": "100/minute - Health checks"
-        },
-        "note": "Rate limits are per IP address per minute",
-        "android_app_tips": [
-            "Cache popular movies locally",
-            "Implement retry logic with exponential backoff",
-            "Show loading states during API calls",
-            "Handle 429 errors gracefully"
-        ]
-    }
+    return Response(content=_RATE_LIMITS_BYTES, media_type="application/json")
 
 # Error handlers
 @app.exception_handler(HTTPException)
@@ -518,7 +605,7 @@ async def http_exception_handler(request: Request, exc: HTTPException):
         "error": "HTTP Exception",
         "message": exc.detail,
         "status_code": exc.status_code,
-        "timestamp": datetime.now()
+        "timestamp": _now()
     }
 
 @app.exception_handler(Exception)
@@ -527,7 +614,7 @@ async def general_exception_handler(request: Request, exc: Exception):
     return {
         "error": "Internal Server Error",
         "message": "An unexpected error occurred",
-        "timestamp": datetime.now()
+        "timestamp": _now()
     }
 
 if __name__ == "__main__":
@@ -540,11 +627,15 @@ if __name__ == "__main__":
     logger.info(f"🔄 Reload: {FASTAPI_RELOAD}")
     logger.info(f"🐛 Debug: {FASTAPI_DEBUG}")
     logger.info(f"📝 Log Level: {FASTAPI_LOG_LEVEL}")
+    logger.info(f"👷 Workers: {FASTAPI_WORKERS}")
     
     uvicorn.run(
         "main:app", 
         host=FASTAPI_HOST,
         port=FASTAPI_PORT,
         reload=FASTAPI_RELOAD,
+        workers=FASTAPI_WORKERS,
+        loop="uvloop",
+        http="httptools",
         log_level=FASTAPI_LOG_LEVEL
     )
\ No newline at end of file
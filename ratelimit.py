@@ -0,0 +1,97 @@
+import time
+import logging
+from functools import wraps
+from fastapi import Request
+
+logger = logging.getLogger(__name__)
+
+# Atomic fixed-window counter: one round trip per check
+RATE_LIMIT_LUA = """
+local current = redis.call('INCR', KEYS[1])
+if current == 1 then
+    redis.call('PEXPIRE', KEYS[1], ARGV[1])
+end
+return {current, redis.call('PTTL', KEYS[1])}
+"""
+
+PERIODS_MS = {
+    'second': 1000,
+    'minute': 60 * 1000,
+    'hour': 60 * 60 * 1000,
+    'day': 24 * 60 * 60 * 1000
+}
+
+
+class RateLimitExceeded(Exception):
+    def __init__(self, limit: str, retry_after: int):
+        super().__init__(limit)
+        self.detail = limit
+        self.retry_after = retry_after
+
+
+def get_remote_address(request: Request) -> str:
+    """Client IP, used as the rate limit key"""
+    return request.client.host if request.client else "127.0.0.1"
+
+
+def parse_limit(limit: str):
+    """Parse '10/minute' into (10, 60000)"""
+    count, period = limit.split('/')
+    return int(count), PERIODS_MS[period.strip().rstrip('s')]
+
+
+class Limiter:
+    """
+    Per-route rate limits keyed by client address and route path. Counters
+    live in Redis (via a Lua script) once setup() is given a client, so all
+    workers share them; otherwise they are kept in process memory.
+    """
+
+    def __init__(self, key_func=get_remote_address):
+        self.key_func = key_func
+        self.script = None
+        self.windows = {}
+
+    def setup(self, redis=None) -> None:
+        if redis is not None:
+            # register_script uses EVALSHA and reloads the script if Redis lost it
+            self.script = redis.register_script(RATE_LIMIT_LUA)
+
+    async def hit(self, key: str, count: int, window_ms: int):
+        """Count a request; returns (allowed, retry_after_seconds)"""
+        if self.script is not None:
+            try:
+                current, ttl_ms = await self.script(keys=[key], args=[window_ms])
+                return current <= count, max(1, -(-ttl_ms // 1000))
+            except Exception as e:
+                # Fail open rather than rejecting traffic when Redis is unavailable
+                logger.error(f"Rate limit check failed: {e}")
+                return True, 0
+
+        now = time.monotonic()
+        window = self.windows.get(key)
+        if window is None or window[1] <= now:
+            window = self.windows[key] = [0, now + window_ms / 1000]
+            if len(self.windows) > 10000:
+                self.windows = {k: w for k, w in self.windows.items() if w[1] > now}
+        window[0] += 1
+        return window[0] <= count, max(1, int(window[1] - now + 0.999))
+
+    def limit(self, limit: str):
+        """Decorate an endpoint (which must take a `request` argument) with a limit like '10/minute'"""
+        count, window_ms = parse_limit(limit)
+
+        def decorator(func):
+            @wraps(func)
+            async def wrapper(*args, **kwargs):
+                request: Request = kwargs['request']
+                route = request.scope.get('route')
+                path = route.path if route is not None else request.url.path
+                key = f"ratelimit:{self.key_func(request)}:{path}"
+
+                allowed, retry_after = await self.hit(key, count, window_ms)
+                if not allowed:
+                    raise RateLimitExceeded(limit, retry_after)
+                return await func(*args, **kwargs)
+            return wrapper
+        return decorator
@@ -0,0 +1,247 @@
+import uuid
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from collections import deque
+from typing import List, Optional, Dict, Any
+import os
+
+# Timestamps are stored as epoch seconds and only turned into datetimes at the edge
+_time = time.time
+
+# Sliding window of chat history kept per session
+MAX_SESSION_MESSAGES = int(os.getenv('MAX_SESSION_MESSAGES', '100'))
+# Idle sessions expire after this many seconds
+SESSION_TTL = int(os.getenv('SESSION_TTL', '86400'))
+
+
+def create_session_id() -> str:
+    """Generate unique session ID"""
+    return str(uuid.uuid4())
+
+
+@dataclass(slots=True)
+class Session:
+    """In-memory session record"""
+    messages: deque
+    created_at: float
+    last_activity: float
+
+
+class RedisSessionStore:
+    """
+    Session metadata and chat history backed by Redis.
+
+    Metadata lives in a hash at ``session:{id}`` and the history in a capped
+    list at ``session:{id}:messages``, so every worker sees the same sessions
+    and nothing is lost on restart. Agent state itself is kept by the graph
+    checkpointer, keyed by the same session ID. Both keys carry a TTL that is
+    refreshed on activity, so Redis expires idle sessions on its own.
+    """
+
+    INDEX_KEY = 'sessions'
+
+    def __init__(self, redis, max_messages: int = MAX_SESSION_MESSAGES, ttl: int = SESSION_TTL):
+        self.redis = redis
+        self.max_messages = max_messages
+        self.ttl = ttl
+
+    @staticmethod
+    def _key(session_id: str) -> str:
+        return f"session:{session_id}"
+
+    @staticmethod
+    def _messages_key(session_id: str) -> str:
+        return f"session:{session_id}:messages"
+
+    async def exists(self, session_id: str) -> bool:
+        return bool(await self.redis.exists(self._key(session_id)))
+
+    async def get_or_create(self, session_id: Optional[str] = None) -> str:
+        """Get existing session or create new one"""
+        now = _time()
+        if session_id and await self.exists(session_id):
+            async with self.redis.pipeline(transaction=True) as pipe:
+                pipe.hset(self._key(session_id), 'last_activity', now)
+                pipe.expire(self._key(session_id), self.ttl)
+                pipe.expire(self._messages_key(session_id), self.ttl)
+                await pipe.execute()
+            return session_id
+
+        new_session_id = create_session_id()
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.hset(self._key(new_session_id), mapping={
+                'created_at': now,
+                'last_activity': now
+            })
+            pipe.expire(self._key(new_session_id), self.ttl)
+            pipe.sadd(self.INDEX_KEY, new_session_id)
+            await pipe.execute()
+        return new_session_id
+
+    async def append_message(self, session_id: str, message: bytes) -> None:
+        """Append a JSON-encoded message, keeping only the newest messages"""
+        messages_key = self._messages_key(session_id)
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.rpush(messages_key, message)
+            pipe.ltrim(messages_key, -self.max_messages, -1)
+            pipe.hset(self._key(session_id), 'last_activity', _time())
+            pipe.expire(self._key(session_id), self.ttl)
+            pipe.expire(messages_key, self.ttl)
+            await pipe.execute()
+
+    async def get_messages_json(self, session_id: str) -> bytes:
+        """History as a JSON array, joined from the stored encoded messages"""
+        return b"[" + b",".join(await self.redis.lrange(self._messages_key(session_id), 0, -1)) + b"]"
+
+    async def _fetch_fields(self, *fields: str):
+        """
+        (session_id, values, message_count) for every indexed session, in one
+        pipelined round trip. message_count is the stored (capped) history length.
+        """
+        session_ids = [session_id.decode() for session_id in await self.redis.smembers(self.INDEX_KEY)]
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for session_id in session_ids:
+                pipe.hmget(self._key(session_id), fields)
+                pipe.llen(self._messages_key(session_id))
+            results = await pipe.execute()
+        # Sessions that already expired come back as all-None rows
+        return [(session_id, values, count)
+                for session_id, values, count in zip(session_ids, results[::2], results[1::2])
+                if values[0] is not None]
+
+    async def list_sessions(self) -> List[Dict[str, Any]]:
+        return [
+            {
+                'session_id': session_id,
+                'created_at': datetime.fromtimestamp(float(created_at)),
+                'last_activity': datetime.fromtimestamp(float(last_activity)),
+                'message_count': message_count
+            }
+            for session_id, (created_at, last_activity), message_count
+            in await self._fetch_fields('created_at', 'last_activity')
+        ]
+
+    async def stats(self) -> Dict[str, int]:
+        counts = [count for _, _, count in await self._fetch_fields('created_at')]
+        return {
+            'active_sessions': len(counts),
+            'total_messages': sum(counts)
+        }
+
+    async def reset(self, session_id: str) -> bool:
+        if not await self.exists(session_id):
+            return False
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.delete(self._messages_key(session_id))
+            pipe.hset(self._key(session_id), 'last_activity', _time())
+            pipe.expire(self._key(session_id), self.ttl)
+            await pipe.execute()
+        return True
+
+    async def expire_sessions(self) -> List[str]:
+        """Drop index entries whose session keys Redis has already expired"""
+        session_ids = [session_id.decode() for session_id in await self.redis.smembers(self.INDEX_KEY)]
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for session_id in session_ids:
+                pipe.exists(self._key(session_id))
+            alive = await pipe.execute()
+
+        expired = [session_id for session_id, exists in zip(session_ids, alive) if not exists]
+        if expired:
+            await self.redis.srem(self.INDEX_KEY, *expired)
+        return expired
+
+    async def delete(self, session_id: str) -> bool:
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.delete(self._key(session_id), self._messages_key(session_id))
+            pipe.srem(self.INDEX_KEY, session_id)
+            deleted, _ = await pipe.execute()
+        return bool(deleted)
+
+    async def clear(self) -> List[str]:
+        """Delete every session and return the IDs that were removed"""
+        session_ids = [session_id.decode() for session_id in await self.redis.smembers(self.INDEX_KEY)]
+        async with self.redis.pipeline(transaction=True) as pipe:
+            for session_id in session_ids:
+                pipe.delete(self._key(session_id), self._messages_key(session_id))
+            pipe.delete(self.INDEX_KEY)
+            await pipe.execute()
+        return session_ids
+
+
+class MemorySessionStore:
+    """In-memory fallback for development (state is per-process)"""
+
+    def __init__(self, max_messages: int = MAX_SESSION_MESSAGES, ttl: int = SESSION_TTL):
+        self.max_messages = max_messages
+        self.ttl = ttl
+        self.sessions: Dict[str, Session] = {}
+
+    async def exists(self, session_id: str) -> bool:
+        return session_id in self.sessions
+
+    async def get_or_create(self, session_id: Optional[str] = None) -> str:
+        """Get existing session or create new one"""
+        now = _time()
+        if session_id and session_id in self.sessions:
+            self.sessions[session_id].last_activity = now
+            return session_id
+
+        new_session_id = create_session_id()
+        self.sessions[new_session_id] = Session(
+            messages=deque(maxlen=self.max_messages),
+            created_at=now,
+            last_activity=now
+        )
+        return new_session_id
+
+    async def append_message(self, session_id: str, message: bytes) -> None:
+        session = self.sessions[session_id]
+        session.messages.append(message)
+        session.last_activity = _time()
+
+    async def get_messages_json(self, session_id: str) -> bytes:
+        return b"[" + b",".join(self.sessions[session_id].messages) + b"]"
+
+    async def list_sessions(self) -> List[Dict[str, Any]]:
+        return [
+            {
+                'session_id': session_id,
+                'created_at': datetime.fromtimestamp(session.created_at),
+                'last_activity': datetime.fromtimestamp(session.last_activity),
+                'message_count': len(session.messages)
+            }
+            for session_id, session in self.sessions.items()
+        ]
+
+    async def stats(self) -> Dict[str, int]:
+        return {
+            'active_sessions': len(self.sessions),
+            'total_messages': sum(len(session.messages) for session in self.sessions.values())
+        }
+
+    async def reset(self, session_id: str) -> bool:
+        if session_id not in self.sessions:
+            return False
+        session = self.sessions[session_id]
+        session.messages.clear()
+        session.last_activity = _time()
+        return True
+
+    async def expire_sessions(self) -> List[str]:
+        """Remove sessions idle for longer than the TTL"""
+        cutoff = _time() - self.ttl
+        expired = [session_id for session_id, session in self.sessions.items()
+                   if session.last_activity < cutoff]
+        for session_id in expired:
+            del self.sessions[session_id]
+        return expired
+
+    async def delete(self, session_id: str) -> bool:
+        return self.sessions.pop(session_id, None) is not None
+
+    async def clear(self) -> List[str]:
+        session_ids = list(self.sessions)
+        self.sessions.clear()
+        return session_ids
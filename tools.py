@@ -1,53 +1,226 @@
-import requests
+import asyncio
+import hashlib
+import logging
+from urllib.parse import urlencode
+import httpx
+import orjson
+from cachetools import TTLCache
 from langchain_core.tools import tool
+from _project import _format_movie_details, _format_movie_results, _format_watch_providers
+# Re-exported: the genre tables lived here before moving to _project
+from _project import GENRE_MAPPING, GENRE_ID_TO_NAME  # noqa: F401
+try:
+    import hishel
+except ImportError:
+    hishel = None
 from dotenv import load_dotenv
 import os
+from types import MappingProxyType
+from typing import Callable, Mapping, Optional
 load_dotenv()
+logger = logging.getLogger(__name__)
 API_KEY = os.getenv('tmdb_api_key')
-MOVIE_LIST_TYPES = {
+# TMDB v4 read access token, sent as a Bearer header instead of ?api_key=
+READ_TOKEN = os.getenv('tmdb_read_token')
+
+TMDB_BASE_URL = "https://api.themoviedb.org/3"
+# Bounded waits on every phase, including waiting for a pooled connection,
+# so a stalled TMDB endpoint can't pile up requests indefinitely
+DEFAULT_TIMEOUT = httpx.Timeout(connect=3.0, read=10.0, write=5.0, pool=2.0)
+
+# Static paths, relative to the client's base_url
+SEARCH_PATH = "/search/movie"
+DISCOVER_PATH = "/discover/movie"
+
+# Query params shared by every request, built once
+_DEFAULT_PARAMS = MappingProxyType({'language': 'en-US'})
+
+# Retry policy for transient TMDB failures
+MAX_RETRIES = 3
+RETRY_BACKOFF = 0.2
+RETRY_STATUSES = frozenset((429, 500, 502, 503, 504))
+
+# RFC 9111 HTTP cache under the client: honours TMDB's Cache-Control and
+# revalidates stale entries with If-None-Match, so misses in the payload caches
+# below often come back as a cheap 304
+HTTP_CACHE_ENABLED = os.getenv('HTTP_CACHE_ENABLED', 'True').lower() == 'true'
+HTTP_CACHE_TTL = int(os.getenv('HTTP_CACHE_TTL', '3600'))
+
+# Shared HTTP client for all TMDB calls, installed by the API lifespan
+_http_client = None
+# Optional Redis client shared across workers, installed by the API lifespan
+_redis_client = None
+
+
+def create_http_client() -> httpx.AsyncClient:
+    """
+    Build a pooled keep-alive client for TMDB (connection errors are retried by
+    the transport). httpx negotiates gzip/deflate, plus brotli when installed.
+    Auth goes in a header so URLs carry no secret and are stable cache keys;
+    without a read token the v3 api_key is added as a default query param.
+    """
+    limits = httpx.Limits(max_connections=100, max_keepalive_connections=20)
+    if READ_TOKEN:
+        auth = {'headers': {'Authorization': f"Bearer {READ_TOKEN}"}}
+    else:
+        auth = {'params': {'api_key': API_KEY}}
+    transport = httpx.AsyncHTTPTransport(http2=True, limits=limits, retries=MAX_RETRIES)
+    if HTTP_CACHE_ENABLED and hishel is not None:
+        transport = hishel.AsyncCacheTransport(
+            transport=transport,
+            storage=hishel.AsyncFileStorage(ttl=HTTP_CACHE_TTL)
+        )
+    return httpx.AsyncClient(
+        base_url=TMDB_BASE_URL,
+        **auth,
+        timeout=DEFAULT_TIMEOUT,
+        transport=transport
+    )
+
+
+def set_http_client(client: httpx.AsyncClient) -> None:
+    """Use the given pooled client for all TMDB requests"""
+    global _http_client
+    _http_client = client
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Return the shared client, creating a default one outside the API (e.g. the CLI)"""
+    global _http_client
+    if _http_client is None:
+        _http_client = create_http_client()
+    return _http_client
+
+
+def set_redis_client(client) -> None:
+    """Share TMDB responses across processes through the given Redis client"""
+    global _redis_client
+    _redis_client = client
+
+
+async def close_http_client() -> None:
+    """Close the shared client and its pooled connections"""
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+
+
+async def _get(url: str, params: Mapping) -> httpx.Response:
+    """GET on the shared client, retrying rate-limited and 5xx responses with backoff"""
+    client = get_http_client()
+    for attempt in range(MAX_RETRIES + 1):
+        response = await client.get(url, params=params)
+        if response.status_code not in RETRY_STATUSES or attempt == MAX_RETRIES:
+            return response
+        await asyncio.sleep(RETRY_BACKOFF * 2 ** attempt)
+
+
+# Parsed TMDB payloads keyed by (path, params): movie data and search results
+# are stable, list rankings (popular/trending/discover) change through the day
+_STABLE_CACHE = TTLCache(maxsize=1024, ttl=3600)
+_LISTS_CACHE = TTLCache(maxsize=256, ttl=300)
+# Cache misses currently being fetched, so concurrent identical lookups share one request
+_inflight = {}
+
+
+def ttl_for(path: str) -> int:
+    """Redis TTL in seconds for a TMDB path"""
+    if path.startswith('/trending/') or path == DISCOVER_PATH:
+        return 600
+    if path.endswith('/watch/providers'):
+        return 6 * 3600
+    if path.startswith('/movie/') and path.split('/')[2] in MOVIE_LIST_TYPES:
+        return 600
+    if path == SEARCH_PATH:
+        return 3600
+    # Movie details and recommendations
+    return 24 * 3600
+
+
+async def _fetch(path: str, params: Mapping, cache: TTLCache,
+                 project: Optional[Callable[[dict], dict]] = None) -> dict:
+    """
+    GET a TMDB path as parsed JSON. Looks in the in-process cache, then the
+    shared Redis cache (when installed), then TMDB. Errors are not cached.
+    Concurrent misses for the same request await a single fetch.
+
+    With project, the payload is reduced as soon as it is parsed, and only
+    the projection is cached, so large responses (full credits) are dropped
+    right away instead of being kept in both caches.
+    """
+    items = tuple(sorted(params.items()))
+    key = (path, items, project)
+    data = cache.get(key)
+    if data is not None:
+        return data
+
+    task = _inflight.get(key)
+    if task is None:
+        task = _inflight[key] = asyncio.create_task(_load(path, params, cache, key, items, project))
+        task.add_done_callback(lambda _: _inflight.pop(key, None))
+    # Shielded so one caller being cancelled doesn't cancel the fetch for the others
+    return await asyncio.shield(task)
+
+
+async def _load(path: str, params: Mapping, cache: TTLCache, key: tuple, items: tuple,
+                project: Optional[Callable[[dict], dict]]) -> dict:
+    """Fill a cache miss from Redis or TMDB"""
+    redis_key = None
+    if _redis_client is not None:
+        # Projected entries get their own keys so they never mix with raw payloads
+        suffix = f"#{project.__name__}" if project is not None else ""
+        redis_key = "tmdb:" + hashlib.blake2b(f"{path}?{urlencode(items)}{suffix}".encode(), digest_size=16).hexdigest()
+        try:
+            blob = await _redis_client.get(redis_key)
+            if blob is not None:
+                data = cache[key] = orjson.loads(blob)
+                return data
+        except Exception as e:
+            logger.error(f"TMDB cache read failed: {e}")
+
+    response = await _get(path, params)
+    data = orjson.loads(response.content)
+    if response.status_code != 200:
+        # Error payloads are returned as-is (never projected or cached), flagged
+        # the way TMDB flags them so callers can tell them apart
+        if isinstance(data, dict):
+            data.setdefault('success', False)
+        return data
+    if project is not None:
+        data = project(data)
+    cache[key] = data
+    if redis_key is not None:
+        try:
+            await _redis_client.set(redis_key, orjson.dumps(data), ex=ttl_for(path))
+        except Exception as e:
+            logger.error(f"TMDB cache write failed: {e}")
+    return data
+
+
+# Read-only lookup tables, built once at import
+MOVIE_LIST_TYPES = MappingProxyType({
     'popular': 'popular',
     'top_rated': 'top_rated',
     'now_playing': 'now_playing',
     'upcoming': 'upcoming'
-}
-
-GENRE_MAPPING = {
-    # Action & Adventure
-    'action': 28,
-    'adventure': 12,
-    'thriller': 53,
-
-    # Comedy & Drama
-    'comedy': 35,
-    'funny': 35,
-    'drama': 18,
-
-    # Horror & Mystery
-    'horror': 27,
-    'scary': 27,
-    'mystery': 9648,
-
-    # Romance & Family
-    'romance': 10749,
-    'romantic': 10749,
-    'family': 10751,
-
-    # Sci-Fi & Fantasy
-    'science fiction': 878,
-    'sci-fi': 878,
-    'fantasy': 14,
-
-    # Other
-    'documentary': 99,
-    'animation': 16,
-    'crime': 80,
-    'war': 10752,
-    'western': 37
-}
+})
+
+# Valid path segments, checked before spending a round trip on a bad value
+_LIST_TYPES = frozenset(MOVIE_LIST_TYPES)
+_TIME_WINDOWS = frozenset(('day', 'week'))
+
+# Only credits are appended; images/videos would multiply the payload for
+# fields that are never returned
+_DETAILS_PARAMS_WITH_CREDITS = MappingProxyType({**_DEFAULT_PARAMS, 'append_to_response': 'credits'})
+
+
+def _details_params(append_credits: bool = True) -> Mapping:
+    return _DETAILS_PARAMS_WITH_CREDITS if append_credits else _DEFAULT_PARAMS
 
 
 @tool(parse_docstring=True)
-def get_movie_details(movie_id: int, append_credits: bool = True) -> dict:
+async def get_movie_details(movie_id: int, append_credits: bool = True) -> dict:
     """
     Get detailed information about a specific movie including cast, crew, and ratings.
 
@@ -63,53 +236,15 @@ def get_movie_details(movie_id: int, append_credits: bool = True) -> dict:
         >>> get_movie_details(157336)
         {'title': 'Interstellar', 'runtime': 169, 'vote_average': 8.4, ...}
     """
-    url = f"https://api.themoviedb.org/3/movie/{movie_id}"
-    params = {
-        'api_key': API_KEY,
-        'language': 'en-US'
-    }
-
-    if append_credits:
-        params['append_to_response'] = 'credits'
-
-    response = requests.get(url, params=params).json()
-
-    # Filter to essential fields only
-    filtered_response = {
-        'id': response.get('id'),
-        'title': response.get('title'),
-        'overview': response.get('overview'),
-        'release_date': response.get('release_date'),
-        'runtime': response.get('runtime'),
-        'vote_average': response.get('vote_average'),
-        'vote_count': response.get('vote_count'),
-        'budget': response.get('budget'),
-        'revenue': response.get('revenue'),
-        'genres': [genre['name'] for genre in response.get('genres', [])],
-    }
-
-    # Add cast and crew if credits are included
-    if 'credits' in response:
-        credits = response['credits']
-        filtered_response['cast'] = [
-            {
-                'name': person['name'],
-                'character': person['character']
-            }
-            for person in credits.get('cast', [])[:10]  # Limit to top 10 cast
-        ]
-
-        # Get director from crew
-        crew = credits.get('crew', [])
-        directors = [person['name']
-                     for person in crew if person['job'] == 'Director']
-        filtered_response['director'] = directors[0] if directors else None
+    url = f"/movie/{movie_id}"
+    params = _details_params(append_credits)
 
-    return filtered_response
+    # The cached value is already the formatted details
+    return await _fetch(url, params, _STABLE_CACHE, _format_movie_details)
 
 
 @tool(parse_docstring=True)
-def search_movies(query: str, page: int = 1) -> dict:
+async def search_movies(query: str, page: int = 1) -> dict:
     """
     Search for movies by title or name using TMDB API.
 
@@ -125,38 +260,14 @@ def search_movies(query: str, page: int = 1) -> dict:
         >>> search_movies("Interstellar")
         {'results': [{'title': 'Interstellar', 'release_date': '2014-11-07', ...}]}
     """
-    url = f"https://api.themoviedb.org/3/search/movie"
-    params = {
-        'api_key': API_KEY,
-        'query': query,
-        'page': page,
-        'language': 'en-US'
-    }
-    response = requests.get(url, params=params).json()
-
-    # Filter to only essential fields
-    if 'results' in response:
-        filtered_results = []
-        for movie in response['results'][:5]:  # Limit to top 5 results
-            filtered_movie = {
-                'id': movie.get('id'),
-                'title': movie.get('title'),
-                'release_date': movie.get('release_date'),
-                'vote_average': movie.get('vote_average'),
-                'overview': movie.get('overview', '')[:200] + '...' if len(movie.get('overview', '')) > 200 else movie.get('overview', '')
-            }
-            filtered_results.append(filtered_movie)
-
-        return {
-            'results': filtered_results,
-            'total_results': min(response.get('total_results', 0), 5)
-        }
+    params = {**_DEFAULT_PARAMS, 'query': query, 'page': page}
+    response = await _fetch(SEARCH_PATH, params, _STABLE_CACHE)
 
-    return response
+    return _format_movie_results(response, 200)
 
 
 @tool(parse_docstring=True)
-def discover_movies(genre_id: int = None, sort_by: str = 'popularity.desc', page: int = 1) -> dict:
+async def discover_movies(genre_id: int = None, sort_by: str = 'popularity.desc', page: int = 1) -> dict:
     """
     Discover movies by genre, popularity, ratings, and year.
 
@@ -172,43 +283,18 @@ def discover_movies(genre_id: int = None, sort_by: str = 'popularity.desc', page
         >>> discover_movies(genre_id=28, page=1)
         {'results': [{'title': 'Action Movie', 'genre_ids': [28], ...}]}
     """
-    url = f"https://api.themoviedb.org/3/discover/movie"
-    params = {
-        'api_key': API_KEY,
-        'language': 'en-US',
-        'sort_by': sort_by,
-        'page': page,
-        'include_adult': False
-    }
+    params = {**_DEFAULT_PARAMS, 'sort_by': sort_by, 'page': page, 'include_adult': False}
 
     if genre_id:
         params['with_genres'] = genre_id
 
-    response = requests.get(url, params=params).json()
-
-    # Filter to only essential fields
-    if 'results' in response:
-        filtered_results = []
-        for movie in response['results'][:5]:  # Limit to top 5 results
-            filtered_movie = {
-                'id': movie.get('id'),
-                'title': movie.get('title'),
-                'release_date': movie.get('release_date'),
-                'vote_average': movie.get('vote_average'),
-                'overview': movie.get('overview', '')[:150] + '...' if len(movie.get('overview', '')) > 150 else movie.get('overview', '')
-            }
-            filtered_results.append(filtered_movie)
+    response = await _fetch(DISCOVER_PATH, params, _LISTS_CACHE)
 
-        return {
-            'results': filtered_results,
-            'total_results': min(response.get('total_results', 0), 5)
-        }
-
-    return response
+    return _format_movie_results(response)
 
 
 @tool(parse_docstring=True)
-def get_movie_lists(list_type: str = 'popular', page: int = 1) -> dict:
+async def get_movie_lists(list_type: str = 'popular', page: int = 1) -> dict:
     """
     Get popular, top-rated, now-playing, or upcoming movies from TMDB.
 
@@ -225,37 +311,18 @@ def get_movie_lists(list_type: str = 'popular', page: int = 1) -> dict:
         >>> get_movie_lists('popular')
         {'results': [{'title': 'Popular Movie', 'vote_average': 8.5, ...}]}
     """
-    url = f"https://api.themoviedb.org/3/movie/{list_type}"
-    params = {
-        'api_key': API_KEY,
-        'language': 'en-US',
-        'page': page
-    }
-    response = requests.get(url, params=params).json()
+    if list_type not in _LIST_TYPES:
+        return {'success': False, 'status_message': f"Invalid list_type '{list_type}'. Options: {', '.join(MOVIE_LIST_TYPES)}"}
 
-    # Filter to only essential fields
-    if 'results' in response:
-        filtered_results = []
-        for movie in response['results'][:5]:  # Limit to top 5 results
-            filtered_movie = {
-                'id': movie.get('id'),
-                'title': movie.get('title'),
-                'release_date': movie.get('release_date'),
-                'vote_average': movie.get('vote_average'),
-                'overview': movie.get('overview', '')[:150] + '...' if len(movie.get('overview', '')) > 150 else movie.get('overview', '')
-            }
-            filtered_results.append(filtered_movie)
+    url = f"/movie/{list_type}"
+    params = {**_DEFAULT_PARAMS, 'page': page}
+    response = await _fetch(url, params, _LISTS_CACHE)
 
-        return {
-            'results': filtered_results,
-            'total_results': min(response.get('total_results', 0), 5)
-        }
-
-    return response
+    return _format_movie_results(response)
 
 
 @tool(parse_docstring=True)
-def get_trending_movies(time_window: str = 'day', page: int = 1) -> dict:
+async def get_trending_movies(time_window: str = 'day', page: int = 1) -> dict:
     """
     Get trending movies for a specified time window from TMDB.
 
@@ -271,36 +338,20 @@ def get_trending_movies(time_window: str = 'day', page: int = 1) -> dict:
         >>> get_trending_movies('day')
         {'results': [{'title': 'Trending Movie', 'vote_average': 8.2, ...}]}
     """
-    url = f"https://api.themoviedb.org/3/trending/movie/{time_window}"
+    if time_window not in _TIME_WINDOWS:
+        return {'success': False, 'status_message': f"Invalid time_window '{time_window}'. Options: day, week"}
+
+    url = f"/trending/movie/{time_window}"
     params = {
-        'api_key': API_KEY,
         'page': page
     }
-    response = requests.get(url, params=params).json()
-
-    # Filter to only essential fields
-    if 'results' in response:
-        filtered_results = []
-        for movie in response['results'][:5]:  # Limit to top 5 results
-            filtered_movie = {
-                'id': movie.get('id'),
-                'title': movie.get('title'),
-                'release_date': movie.get('release_date'),
-                'vote_average': movie.get('vote_average'),
-                'overview': movie.get('overview', '')[:150] + '...' if len(movie.get('overview', '')) > 150 else movie.get('overview', '')
-            }
-            filtered_results.append(filtered_movie)
-
-        return {
-            'results': filtered_results,
-            'total_results': min(response.get('total_results', 0), 5)
-        }
+    response = await _fetch(url, params, _LISTS_CACHE)
 
-    return response
+    return _format_movie_results(response)
 
 
 @tool(parse_docstring=True)
-def get_movie_recommendations(movie_id: int, page: int = 1) -> dict:
+async def get_movie_recommendations(movie_id: int, page: int = 1) -> dict:
     """
     Get similar or recommended movies based on a specific movie from TMDB.
 
@@ -315,36 +366,14 @@ def get_movie_recommendations(movie_id: int, page: int = 1) -> dict:
         >>> get_movie_recommendations(157336)
         {'results': [{'title': 'Similar Movie', 'vote_average': 7.8, ...}]}
     """
-    url = f"https://api.themoviedb.org/3/movie/{movie_id}/recommendations"
-    params = {
-        'api_key': API_KEY,
-        'language': 'en-US',
-        'page': page
-    }
-    response = requests.get(url, params=params).json()
-
-    # Filter to only essential fields
-    if 'results' in response:
-        filtered_results = []
-        for movie in response['results'][:5]:  # Limit to top 5 results
-            filtered_movie = {
-                'id': movie.get('id'),
-                'title': movie.get('title'),
-                'release_date': movie.get('release_date'),
-                'vote_average': movie.get('vote_average'),
-                'overview': movie.get('overview', '')[:150] + '...' if len(movie.get('overview', '')) > 150 else movie.get('overview', '')
-            }
-            filtered_results.append(filtered_movie)
-
-        return {
-            'results': filtered_results,
-            'total_results': min(response.get('total_results', 0), 5)
-        }
-
-    return response
+    url = f"/movie/{movie_id}/recommendations"
+    params = {**_DEFAULT_PARAMS, 'page': page}
+    response = await _fetch(url, params, _STABLE_CACHE)
+
+    return _format_movie_results(response)
 
 @tool(parse_docstring=True)
-def get_watch_providers(movie_id: int, region: str = 'US') -> dict:
+async def get_watch_providers(movie_id: int, region: str = 'US') -> dict:
     """
     Get streaming availability and watch options for a movie by region.
 
@@ -361,57 +390,48 @@ def get_watch_providers(movie_id: int, region: str = 'US') -> dict:
         >>> get_watch_providers(550)
         {'streaming': ['Netflix', 'Hulu'], 'rent': ['Amazon Video'], 'buy': ['iTunes']}
     """
-    url = f"https://api.themoviedb.org/3/movie/{movie_id}/watch/providers"
-    params = {
-        'api_key': API_KEY,
-        'language': 'en-US'
-    }
-    
-    response = requests.get(url, params=params).json()
-    
-    # Extract and format providers for specific region
-    if 'results' in response and region in response['results']:
-        providers_data = response['results'][region]
-        
-        formatted_response = {
-            'movie_id': movie_id,
-            'region': region,
-            'streaming': [],
-            'rent': [],
-            'buy': [],
-            'link': providers_data.get('link', '')
-        }
-        
-        # Streaming services (flatrate/subscription)
-        if 'flatrate' in providers_data:
-            formatted_response['streaming'] = [
-                provider['provider_name'] for provider in providers_data['flatrate']
-            ]
-        
-        # Rental options
-        if 'rent' in providers_data:
-            formatted_response['rent'] = [
-                provider['provider_name'] for provider in providers_data['rent']
-            ]
-        
-        # Purchase options
-        if 'buy' in providers_data:
-            formatted_response['buy'] = [
-                provider['provider_name'] for provider in providers_data['buy']
-            ]
-        
-        return formatted_response
+    url = f"/movie/{movie_id}/watch/providers"
+
+    response = await _fetch(url, _DEFAULT_PARAMS, _STABLE_CACHE)
     
-    else:
-        return {
-            'movie_id': movie_id,
-            'region': region,
-            'streaming': [],
-            'rent': [],
-            'buy': [],
-            'message': f'No streaming information available for this movie in {region}',
-            'link': ''
-        }
+    return _format_watch_providers(response, movie_id, region)
+
+
+@tool(parse_docstring=True)
+async def get_movie_bundle(movie_id: int, region: str = 'US') -> dict:
+    """
+    Get a movie's details, recommendations, and watch providers in one call.
+
+    Args:
+        movie_id (int): The TMDB movie ID to look up.
+        region (str): Country code for watch provider availability (e.g., 'US', 'GB', 'CA').
+                     Defaults to 'US'.
+
+    Returns:
+        dict: Movie details (with cast and director) plus 'recommendations' and
+              'watch_providers' entries.
+
+    Example:
+        >>> get_movie_bundle(157336)
+        {'title': 'Interstellar', 'recommendations': {'results': [...]}, 'watch_providers': {...}}
+    """
+    # The three lookups are independent, so fetch them concurrently
+    details, recommendations, providers = await asyncio.gather(
+        _fetch(f"/movie/{movie_id}", _details_params(), _STABLE_CACHE, _format_movie_details),
+        _fetch(f"/movie/{movie_id}/recommendations",
+               {**_DEFAULT_PARAMS, 'page': 1}, _STABLE_CACHE),
+        _fetch(f"/movie/{movie_id}/watch/providers", _DEFAULT_PARAMS, _STABLE_CACHE)
+    )
+
+    if details.get('success') is False:
+        return details
+
+    # details is the cached projection, so build a new dict rather than extending it
+    return {
+        **details,
+        'recommendations': _format_movie_results(recommendations),
+        'watch_providers': _format_watch_providers(providers, movie_id, region)
+    }
 
 # # Test cases for the movie API functions
 # if __name__ == "__main__":